@@ -2,10 +2,9 @@
 
 import sqlite3
 import logging
-import json
 import os
 from datetime import datetime
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, Iterator, List, Optional, Any
 
 class Database:
     def __init__(self):
@@ -106,6 +105,22 @@ class Database:
             )
         ''')
 
+        # Index for date-range counts over game_history
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_game_history_date_time
+            ON game_history (date_time)
+        ''')
+
+        # Indexes for per-game analytics lookups
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_analytics_history_game_id
+            ON analytics_history (game_id)
+        ''')
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_scoring_patterns_game_id
+            ON scoring_patterns (game_id)
+        ''')
+
         self.conn.commit()
 
     def start_new_game(self, mode: str) -> int:
@@ -210,6 +225,44 @@ class Database:
             logging.error(f"Error getting game stats: {e}")
             return []
 
+    def count_games(self, since: Optional[str] = None) -> int:
+        """Count games, optionally only those played on or after an ISO date"""
+        try:
+            # Own cursor, as this is called from web request threads
+            if since:
+                cursor = self.conn.execute('''
+                    SELECT COUNT(*) FROM game_history WHERE date_time >= ?
+                ''', (since,))
+            else:
+                cursor = self.conn.execute('SELECT COUNT(*) FROM game_history')
+            return cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            logging.error(f"Error counting games: {e}")
+            return 0
+
+    def get_win_counts(self) -> Dict[str, int]:
+        """Get total games and red/blue win counts over the whole game history"""
+        try:
+            # Own cursor: this runs on web request threads, where the shared
+            # self.cursor could be re-executed by the game loop mid-fetch
+            cursor = self.conn.execute('''
+                SELECT 
+                    COUNT(*) as total_games,
+                    SUM(CASE WHEN winner_id = player_red_id THEN 1 ELSE 0 END) as red_wins,
+                    SUM(CASE WHEN winner_id = player_blue_id THEN 1 ELSE 0 END) as blue_wins
+                FROM game_history
+            ''')
+            
+            result = cursor.fetchone()
+            return {
+                'total_games': result[0],
+                'red_wins': result[1] or 0,
+                'blue_wins': result[2] or 0
+            }
+        except sqlite3.Error as e:
+            logging.error(f"Error getting win counts: {e}")
+            return {'total_games': 0, 'red_wins': 0, 'blue_wins': 0}
+
     def get_winners_by_differential(self, diff: int) -> Dict[str, float]:
         """Get historical win rates for a given score differential"""
         try:
@@ -294,6 +347,91 @@ class Database:
             logging.error(f"Error getting analytics history: {e}")
             return []
 
+    def _iter_rows(self, sql: str, params: tuple, batch_size: int) -> Iterator[Dict[str, Any]]:
+        """Yield query rows as dicts, fetching batch_size rows at a time"""
+        # Own cursor, so other queries can run while the caller consumes rows
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            columns = [description[0] for description in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            cursor.close()
+
+    def iter_analytics_history(self, game_id: int, batch_size: int = 256) -> Iterator[Dict[str, Any]]:
+        """Yield analytics history rows for a game without materializing them all"""
+        try:
+            yield from self._iter_rows('''
+                SELECT * FROM analytics_history
+                WHERE game_id = ?
+                ORDER BY timestamp
+            ''', (game_id,), batch_size)
+        except sqlite3.Error as e:
+            # Re-raised so a partial export never passes for a complete one
+            logging.error(f"Error iterating analytics history: {e}")
+            raise
+
+    def iter_scoring_patterns(self, game_id: int, batch_size: int = 256) -> Iterator[Dict[str, Any]]:
+        """Yield scoring pattern rows for a game without materializing them all"""
+        try:
+            yield from self._iter_rows('''
+                SELECT * FROM scoring_patterns
+                WHERE game_id = ?
+                ORDER BY start_time
+            ''', (game_id,), batch_size)
+        except sqlite3.Error as e:
+            logging.error(f"Error iterating scoring patterns: {e}")
+            raise
+
+    def get_full_analytics(self, game_id: int) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """Get analytics history, scoring patterns and game stats for a game in one pass
+
+        Returns None on a database error, so callers can tell a failed read
+        from a game with no data.
+        """
+        queries = (
+            ('analytics_history', 'SELECT * FROM analytics_history WHERE game_id = ? ORDER BY timestamp'),
+            ('scoring_patterns', 'SELECT * FROM scoring_patterns WHERE game_id = ? ORDER BY start_time'),
+            ('game_stats', 'SELECT * FROM game_history WHERE id = ?')
+        )
+        # One cursor for all three reads instead of a method call per table
+        cursor = self.conn.cursor()
+        try:
+            result = {}
+            for key, sql in queries:
+                cursor.execute(sql, (game_id,))
+                columns = [description[0] for description in cursor.description]
+                result[key] = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            return result
+        except sqlite3.Error as e:
+            logging.error(f"Error getting full analytics: {e}")
+            return None
+        finally:
+            cursor.close()
+
+    def get_analytics_version(self, game_id: int) -> Optional[tuple]:
+        """Get a value that changes whenever a game's analytics data changes"""
+        try:
+            # Rows are append-only, so the newest ids plus the mutable
+            # game_history columns identify the current state of the data.
+            # Own cursor, as this is called from web request threads
+            cursor = self.conn.execute('''
+                SELECT
+                    (SELECT MAX(id) FROM analytics_history WHERE game_id = ?),
+                    (SELECT MAX(id) FROM scoring_patterns WHERE game_id = ?),
+                    score_red, score_blue, duration, winner_id
+                FROM game_history WHERE id = ?
+            ''', (game_id, game_id, game_id))
+            return cursor.fetchone()
+        except sqlite3.Error as e:
+            logging.error(f"Error getting analytics version: {e}")
+            return None
+
     def get_scoring_patterns(self, game_id: int) -> List[Dict[str, Any]]:
         """Get scoring patterns for a game"""
         try:
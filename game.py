@@ -10,7 +10,7 @@ import time
 from datetime import datetime
 from settings import Settings
 from database import Database
-from utils import load_image, load_sound
+from utils import load_image, load_sounds_bulk
 from classic_mode import ClassicMode
 from evolved_mode import EvolvedMode
 from crazy_play_mode import CrazyPlayMode
@@ -18,6 +18,35 @@ from game_states import GameStates
 from state_machine import GameStateMachine
 from game_analytics import GameAnalytics, GameState, AnalyticsConfig
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Parsed theme.json files as path -> (st_mtime_ns, data); themes are
+# re-parsed only when the file changes
+_THEME_CONFIG_CACHE = {}
+
+def _load_theme_config(path):
+    """Load a theme.json file, reusing the parsed data while it is unchanged.
+
+    Returns None if the file doesn't exist. The returned dict is shared, so
+    callers must treat it as read-only.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        _THEME_CONFIG_CACHE.pop(path, None)
+        return None
+    cached = _THEME_CONFIG_CACHE.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, 'rb') as f:
+        raw = f.read()
+    data = orjson.loads(raw) if orjson else json.loads(raw)
+    _THEME_CONFIG_CACHE[path] = (mtime, data)
+    return data
+
 class Game:
     def __init__(self, screen_manager, settings, gpio_handler):
         self.screen_manager = screen_manager
@@ -157,9 +186,9 @@ class Game:
         theme_path = f'assets/themes/{self.settings.current_theme}'
         theme_config_path = os.path.join(theme_path, 'theme.json')
         
-        if os.path.exists(theme_config_path):
-            with open(theme_config_path, 'r') as f:
-                self.theme_data = json.load(f)
+        theme_data = _load_theme_config(theme_config_path)
+        if theme_data is not None:
+            self.theme_data = theme_data
         else:
             self.theme_data = {}
             logging.warning(f"Theme configuration not found for theme '{self.settings.current_theme}'. Using default assets.")
@@ -169,13 +198,19 @@ class Game:
         self.font_large = self.load_theme_font('font_large', 'assets/fonts/Pixellari.ttf', 40)
 
         # Load sounds - these will be shared between screens
+        goal, period_start, period_end, game_over = load_sounds_bulk([
+            'assets/sounds/goal_scored.wav',
+            'assets/sounds/period_start.wav',
+            'assets/sounds/period_end.wav',
+            'assets/sounds/game_over.wav'
+        ])
         self.sounds = {
             'taunts': self.load_theme_sounds('taunts', 'assets/sounds/taunts', 5),
             'random_sounds': self.load_theme_sounds('random_sounds', 'assets/sounds/random_sounds', 5),
-            'goal': load_sound('assets/sounds/goal_scored.wav'),
-            'period_start': load_sound('assets/sounds/period_start.wav'),
-            'period_end': load_sound('assets/sounds/period_end.wav'),
-            'game_over': load_sound('assets/sounds/game_over.wav')
+            'goal': goal,
+            'period_start': period_start,
+            'period_end': period_end,
+            'game_over': game_over
         }
     
     def load_theme_font(self, key, default_path, size):
@@ -202,9 +237,8 @@ class Game:
         else:
             sound_dir = default_path
             
-        for i in range(1, count + 1):
-            sound_path = os.path.join(sound_dir, f'{key}_{i}.wav')
-            sound = load_sound(sound_path)
+        sound_paths = [os.path.join(sound_dir, f'{key}_{i}.wav') for i in range(1, count + 1)]
+        for sound in load_sounds_bulk(sound_paths):
             if sound:
                 sounds.append(sound)
         return sounds
@@ -563,11 +597,14 @@ class Game:
         if not self.current_analysis:
             return
             
+        # Collect overlay elements and blit them as a single batch
+        overlay = []
+        
         # Draw win probability
         win_prob = self.current_analysis['win_probability']
         prob_text = f"Win Probability: Red {win_prob['red']:.1%} - Blue {win_prob['blue']:.1%}"
         prob_surface = self.font_small.render(prob_text, True, (255, 255, 255))
-        screen.blit(prob_surface, (10, 10))
+        overlay.append((prob_surface, (10, 10)))
         
         # Draw momentum indicator
         momentum = self.current_analysis['momentum']['current_state']
@@ -575,13 +612,15 @@ class Game:
             momentum_text = f"Momentum: {momentum['team'].upper()} ({momentum['intensity']})"
             momentum_color = (255, 0, 0) if momentum['team'] == side else (255, 255, 255)
             momentum_surface = self.font_small.render(momentum_text, True, momentum_color)
-            screen.blit(momentum_surface, (10, 40))
+            overlay.append((momentum_surface, (10, 40)))
             
         # Draw critical moment indicator
         if self.current_analysis['is_critical_moment']:
             critical_text = "CRITICAL MOMENT!"
             critical_surface = self.font_small.render(critical_text, True, (255, 0, 0))
-            screen.blit(critical_surface, (10, 70))
+            overlay.append((critical_surface, (10, 70)))
+            
+        screen.blits(overlay, doreturn=0)
 
     def display_update_notification(self, screen):
         """Display an update notification on the game screen."""
@@ -2,7 +2,7 @@
 
 import pygame
 import random
-from utils import load_image, load_sound
+from utils import load_sound, load_images_bulk
 import logging
 
 class Intro:
@@ -22,7 +22,7 @@ class Intro:
 
         # Load images
         self.images = {
-            'lava_flow_frames': [load_image(f'assets/images/lava_flow_frames/frame_{i}.png') for i in range(0, 30)],
+            'lava_flow_frames': load_images_bulk([f'assets/images/lava_flow_frames/frame_{i}.png' for i in range(0, 30)]),
         }
 
         # Load sounds
@@ -2,6 +2,7 @@
 
 import os
 import pygame
+import signal
 import sys
 import logging
 from settings import Settings
@@ -22,6 +23,10 @@ def main():
         screen_manager = ScreenManager(settings)
         gpio_handler = GPIOHandler(settings)
         
+        # Treat SIGTERM (e.g. a service stop) like closing the window, so the
+        # normal shutdown path runs and pending settings saves are flushed
+        signal.signal(signal.SIGTERM, lambda signum, frame: pygame.event.post(pygame.event.Event(pygame.QUIT)))
+        
         # Initialize game components
         intro = Intro(screen_manager, settings)
         menu = Menu(screen_manager, settings)
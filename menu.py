@@ -5,7 +5,7 @@ import sys
 import os
 import subprocess
 import logging
-from utils import load_image, load_sound
+from utils import load_sound, load_images_bulk
 
 class Menu:
     def __init__(self, screen_manager, settings):
@@ -39,7 +39,7 @@ class Menu:
         # Load images based on current theme
         theme_path = f'assets/themes/{self.settings.current_theme}'
         self.images = {
-            'volcano_eruption_frames': [load_image(f'{theme_path}/images/volcano_eruption_frames/frame_{i}.png') for i in range(0, 60)],
+            'volcano_eruption_frames': load_images_bulk([f'{theme_path}/images/volcano_eruption_frames/frame_{i}.png' for i in range(0, 60)]),
         }
 
         # Load sounds
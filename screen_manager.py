@@ -3,20 +3,69 @@
 import pygame
 import os
 import logging
-from typing import Dict, Tuple, Optional, Literal
+import sys
+import time
+from collections import deque
+from typing import Deque, Dict, List, Sequence, Tuple, Optional
+
+# Valid screen identifiers. Source literals are interned, so the common
+# case is a pointer comparison; the frozenset catches dynamically built strings.
+_RED = sys.intern('red')
+_BLUE = sys.intern('blue')
+_SIDES = frozenset((_RED, _BLUE))
+
+# Window ids come from pygame's SDL2 window wrapper (pygame >= 2.0). Mouse
+# events carry the Window they happened in, so screens are resolved through
+# an id -> screen map built once at display setup instead of an API call
+# per event.
+if pygame.version.vernum >= (2, 0, 0):
+    from pygame._sdl2.video import Window as _SDLWindow
+else:
+    _SDLWindow = None
+
+# Hot names used by handle_event, bound once at import.
+_MOUSEBUTTONDOWN = pygame.MOUSEBUTTONDOWN
+_MOUSEMOTION = pygame.MOUSEMOTION
+_perf_counter_ns = time.perf_counter_ns
+_get_mouse_pos = pygame.mouse.get_pos
 
 class ScreenManager:
     """Manages dual screen setup for bubble hockey game."""
     
+    # Index of each side in the cached surface tuple
+    SIDE_IDX = {_RED: 0, _BLUE: 1}
+    
+    # Touch zones are bucketed into 64x64 pixel grid cells
+    TOUCH_GRID_SHIFT = 6
+    
+    # Motion samples older than this are too stale to extrapolate from; a
+    # press with no motion this recent is a plain tap and is not extrapolated
+    TOUCH_PREDICTION_MAX_AGE_NS = 100_000_000
+    
+    # Furthest a predicted touch may move from the reported position, per axis
+    TOUCH_PREDICTION_MAX_PX = 16
+    
     def __init__(self, settings):
         """Initialize dual screen management."""
         self.settings = settings
         self.screens: Dict[str, pygame.Surface] = {}
+        self._surfs: Tuple[pygame.Surface, pygame.Surface] = ()
         self.displays: Dict[str, int] = {}
+        # SDL window id -> screen, filled in as the displays are created
+        self._window_screens: Dict[int, str] = {}
         self.active_touch_zones: Dict[str, Dict] = {'red': {}, 'blue': {}}
+        # Zone ids per grid cell, in registration order
+        self._touch_grid: Dict[str, Dict[Tuple[int, int], List[str]]] = {'red': {}, 'blue': {}}
+        self._bg_color: Optional[Tuple[int, int, int]] = None
+        self._bg_mapped: Dict[str, int] = {}
+        # Last two (x, y, timestamp_ns) touch samples per screen
+        self._touch_history: Dict[str, Deque[Tuple[int, int, int]]] = {
+            'red': deque(maxlen=2), 'blue': deque(maxlen=2)
+        }
         
         # Initialize screens
         self._initialize_displays()
+        self._map_bg_color()
         
     def _initialize_displays(self) -> None:
         """Initialize both displays with proper configuration."""
@@ -45,6 +94,7 @@ class ScreenManager:
                     )
                     self.screens[side] = display_surface
                     self.displays[side] = i
+                    self._map_window(side)
                     logging.info(f"Initialized {side} display on screen {i}")
                 except pygame.error as e:
                     logging.error(f"Failed to initialize {side} display: {e}")
@@ -54,14 +104,37 @@ class ScreenManager:
             pygame.display.set_caption("Boiling Point Bubble Hockey - Red Team", display=self.displays['red'])
             pygame.display.set_caption("Boiling Point Bubble Hockey - Blue Team", display=self.displays['blue'])
             
+            # Cache surfaces in side order for hot-path lookups
+            self._surfs = (self.screens['red'], self.screens['blue'])
+            
         except Exception as e:
             logging.error(f"Display initialization failed: {e}")
             raise
             
+    def _map_window(self, side: str) -> None:
+        """Record which screen the current display window belongs to."""
+        if _SDLWindow is None:
+            logging.warning(f"pygame {pygame.version.ver} has no SDL2 window API; touch input on {side} is disabled")
+            return
+            
+        window_id = _SDLWindow.from_display_module().id
+        owner = self._window_screens.setdefault(window_id, side)
+        if owner != side:
+            # pygame reused the window; touches can't be told apart by window
+            logging.warning(f"{side} display shares window {window_id} with {owner}; its touches are routed to {owner}")
+            
+    def _map_bg_color(self) -> None:
+        """Pre-convert the background color to each surface's pixel format."""
+        self._bg_color = self.settings.bg_color
+        self._bg_mapped = {
+            side: surface.map_rgb(self._bg_color)
+            for side, surface in self.screens.items()
+        }
+        
     def register_touch_zone(self, screen: str, zone_id: str, rect: pygame.Rect, 
                            callback, active: bool = True) -> None:
         """Register a touch-interactive zone on a specific screen."""
-        if screen not in self.active_touch_zones:
+        if screen is not _RED and screen is not _BLUE and screen not in _SIDES:
             raise ValueError(f"Invalid screen identifier: {screen}")
             
         self.active_touch_zones[screen][zone_id] = {
@@ -70,41 +143,111 @@ class ScreenManager:
             'active': active
         }
         
-    def handle_event(self, event: pygame.event.Event) -> bool:
+        # Index the zone under every grid cell its rect covers
+        if rect.width > 0 and rect.height > 0:
+            shift = self.TOUCH_GRID_SHIFT
+            grid = self._touch_grid[screen]
+            for gx in range(rect.left >> shift, ((rect.right - 1) >> shift) + 1):
+                for gy in range(rect.top >> shift, ((rect.bottom - 1) >> shift) + 1):
+                    bucket = grid.setdefault((gx, gy), [])
+                    if zone_id not in bucket:
+                        bucket.append(zone_id)
+        
+    def handle_event(self, event: pygame.event.Event,
+                     _MOUSEBUTTONDOWN=_MOUSEBUTTONDOWN,
+                     _MOUSEMOTION=_MOUSEMOTION,
+                     _get_mouse_pos=_get_mouse_pos,
+                     _perf_counter_ns=_perf_counter_ns) -> bool:
         """
         Handle input events for both screens.
         Returns True if event was handled.
         """
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            pos = pygame.mouse.get_pos()
-            display_index = pygame.display.get_window_from_id(event.windowID)
-            
-            # Determine which screen was touched
-            screen = next(
-                (side for side, idx in self.displays.items() if idx == display_index),
-                None
-            )
+        # Module names are bound as default args to make them fast locals
+        event_type = event.type
+        if event_type == _MOUSEMOTION:
+            screen = self._screen_for_event(event)
+            if screen:
+                x, y = event.pos
+                self._touch_history[screen].append((x, y, _perf_counter_ns()))
+                
+        elif event_type == _MOUSEBUTTONDOWN:
+            pos = _get_mouse_pos()
+            screen = self._screen_for_event(event)
             
             if screen and screen in self.active_touch_zones:
-                return self._handle_touch(screen, pos)
+                return self._handle_touch(screen, self._predict_touch(screen, pos))
                 
         return False
         
+    def _screen_for_event(self, event: pygame.event.Event) -> Optional[str]:
+        """Determine which screen a mouse event's window belongs to."""
+        window = getattr(event, 'window', None)
+        if window is None:
+            return None
+        return self._window_screens.get(window.id)
+        
+    def _predict_touch(self, screen: str, pos: Tuple[int, int]) -> Tuple[int, int]:
+        """
+        Extrapolate a touch position one frame ahead to hide input latency.
+        Falls back to the raw position without two recent motion samples.
+        """
+        history = self._touch_history.get(screen)
+        if not history or len(history) < 2:
+            return pos
+            
+        (x0, y0, t0), (x1, y1, t1) = history
+        if _perf_counter_ns() - t0 > self.TOUCH_PREDICTION_MAX_AGE_NS:
+            return pos
+            
+        # Predict to the next flip using the last frame time (ms)
+        frame_ns = (self.settings.clock_tick or 0) * 1_000_000
+        if frame_ns <= 0:
+            return pos
+            
+        # Samples are stamped when handled, not when they happened: motion
+        # drained in one event.get() batch is only microseconds apart, so
+        # never treat the interval as shorter than a frame
+        sample_dt = max(t1 - t0, frame_ns)
+        limit = self.TOUCH_PREDICTION_MAX_PX
+        dx = min(max((x1 - x0) * frame_ns // sample_dt, -limit), limit)
+        dy = min(max((y1 - y0) * frame_ns // sample_dt, -limit), limit)
+        x, y = pos
+        
+        # Keep the prediction on screen
+        px = min(max(x + dx, 0), self.settings.screen_width - 1)
+        py = min(max(y + dy, 0), self.settings.screen_height - 1)
+        return (px, py)
+        
     def _handle_touch(self, screen: str, pos: Tuple[int, int]) -> bool:
         """Handle touch event on a specific screen."""
-        for zone_info in self.active_touch_zones[screen].values():
-            if zone_info['active'] and zone_info['rect'].collidepoint(pos):
+        zones = self.active_touch_zones[screen]
+        shift = self.TOUCH_GRID_SHIFT
+        bucket = self._touch_grid[screen].get((pos[0] >> shift, pos[1] >> shift), ())
+        
+        # Zones may have been removed or replaced since they were indexed,
+        # so always re-check against the live zone entry
+        for zone_id in bucket:
+            zone_info = zones.get(zone_id)
+            if zone_info and zone_info['active'] and zone_info['rect'].collidepoint(pos):
                 zone_info['callback'](screen, pos)
                 return True
         return False
         
     def clear_screen(self, screen: str, color: Optional[Tuple[int, int, int]] = None) -> None:
         """Clear a specific screen with optional background color."""
-        if screen not in self.screens:
-            raise ValueError(f"Invalid screen identifier: {screen}")
+        try:
+            surface = self.screens[screen]
+        except KeyError:
+            raise ValueError(f"Invalid screen identifier: {screen}") from None
+            
+        if color:
+            surface.fill(surface.map_rgb(color))
+            return
             
-        color = color or self.settings.bg_color
-        self.screens[screen].fill(color)
+        # Settings may be changed at runtime via the web interface
+        if self.settings.bg_color is not self._bg_color:
+            self._map_bg_color()
+        surface.fill(self._bg_mapped[screen])
         
     def clear_all_screens(self, color: Optional[Tuple[int, int, int]] = None) -> None:
         """Clear all screens with optional background color."""
@@ -112,8 +255,17 @@ class ScreenManager:
             self.clear_screen(screen, color)
             
     def blit_to_screen(self, screen: str, surface: pygame.Surface, position: Tuple[int, int]) -> None:
-        """Blit a surface to a specific screen."""
-        if screen not in self.screens:
+        """Blit a surface to a specific screen (unvalidated, for per-frame use)."""
+        self._surfs[self.SIDE_IDX[screen]].blit(surface, position)
+        
+    def blit_many(self, screen: str,
+                  blit_sequence: Sequence[Tuple[pygame.Surface, Tuple[int, int]]]) -> None:
+        """Blit a batch of (surface, position) pairs to a screen in one call."""
+        self._surfs[self.SIDE_IDX[screen]].blits(blit_sequence, doreturn=0)
+        
+    def blit_to_screen_safe(self, screen: str, surface: pygame.Surface, position: Tuple[int, int]) -> None:
+        """Blit a surface to a specific screen after validating the identifier."""
+        if screen is not _RED and screen is not _BLUE and screen not in _SIDES:
             raise ValueError(f"Invalid screen identifier: {screen}")
             
         self.screens[screen].blit(surface, position)
@@ -121,19 +273,25 @@ class ScreenManager:
     def update_display(self, screen: Optional[str] = None) -> None:
         """Update specific screen or all screens if none specified."""
         if screen:
-            if screen not in self.screens:
-                raise ValueError(f"Invalid screen identifier: {screen}")
-            pygame.display.update(display=self.displays[screen])
+            try:
+                display = self.displays[screen]
+            except KeyError:
+                raise ValueError(f"Invalid screen identifier: {screen}") from None
+            pygame.display.update(display=display)
         else:
             pygame.display.flip()
             
     def get_screen(self, screen: str) -> pygame.Surface:
         """Get the surface for a specific screen."""
-        if screen not in self.screens:
-            raise ValueError(f"Invalid screen identifier: {screen}")
-        return self.screens[screen]
+        try:
+            return self.screens[screen]
+        except KeyError:
+            raise ValueError(f"Invalid screen identifier: {screen}") from None
         
     def cleanup(self) -> None:
         """Clean up screen manager resources."""
         self.active_touch_zones = {'red': {}, 'blue': {}}
+        self._touch_grid = {'red': {}, 'blue': {}}
+        for history in self._touch_history.values():
+            history.clear()
         # Additional cleanup if needed
@@ -1,63 +1,178 @@
 # settings.py
 
+import atexit
+import copy
+import hashlib
 import json
 import os
 import logging
+import threading
+from types import MappingProxyType
+from typing import Any, ClassVar, Dict, Mapping, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+def _json_loads(raw):
+    """Parse JSON bytes, using orjson when it is available."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _json_dumps(data):
+    """Serialize data to indented JSON bytes, using orjson when it is available."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode()
+
+# Parsed settings files shared by all Settings instances:
+# path -> (st_mtime_ns, st_size, data). Cached data must never be mutated.
+_SETTINGS_CACHE: Dict[str, Tuple[int, int, Dict[str, Any]]] = {}
+
+# Persisted settings as (name, default, type). This table drives the
+# defaults, the JSON loader and the JSON writer.
+FIELDS = (
+    # Screen settings
+    ('screen_width', 1480, int),
+    ('screen_height', 320, int),
+    ('bg_color', (0, 0, 0), tuple),
+
+    # Network settings
+    ('mqtt_broker', 'localhost', str),
+    ('mqtt_port', 1883, int),
+    ('mqtt_topic', 'bubble_hockey/game_status', str),
+    ('web_server_port', 5000, int),
+
+    # Game settings
+    ('period_length', 180, int),
+    ('overtime_length', 180, int),
+    ('intermission_length', 60, int),
+    ('power_up_frequency', 30.0, float),  # Evolved mode sets fractional values
+    ('taunt_frequency', 60, int),
+
+    # Sound settings
+    ('taunts_enabled', True, bool),
+    ('random_sounds_enabled', True, bool),
+    ('random_sound_min_interval', 5, int),   # Minimum interval in seconds
+    ('random_sound_max_interval', 30, int),  # Maximum interval in seconds
+
+    # Combo goal settings
+    ('combo_goals_enabled', True, bool),
+    ('combo_time_window', 30, int),
+    ('combo_reward_type', 'extra_point', str),  # Options: 'extra_point', 'power_up'
+    ('combo_max_stack', 5, int),
+
+    # Theme settings
+    ('current_theme', 'default', str),
+    ('classic_mode_theme_selection', False, bool),
+
+    # GPIO pin configurations
+    ('gpio_pins', {
+        'goal_sensor_red': 17,
+        'goal_sensor_blue': 27,
+        'puck_sensor_red': 22,
+        'puck_sensor_blue': 23
+    }, dict),
+
+    # Analytics settings
+    ('show_analytics_overlay', True, bool),
+)
+
+# Persisted setting name -> type, for single-lookup key filtering
+_FIELD_TYPES: Dict[str, type] = {name: field_type for name, _, field_type in FIELDS}
 
 class Settings:
-    def __init__(self):
+    # Fixed attribute layout; avoids a per-instance __dict__
+    __slots__ = (
+        'settings_file', '_loaded_mtime_ns', '_last_hash',
+        '_save_timer', '_save_lock', '_snapshot_version',
+        '_analytics_config', 'clock_tick',
+    ) + tuple(name for name, _, _ in FIELDS)
+
+    # Persisted setting name -> type, read-only; lets callers coerce input
+    # without inspecting an instance
+    TYPES: ClassVar[Mapping[str, type]] = MappingProxyType(_FIELD_TYPES)
+
+    # Attribute types, declared for type checkers and AOT compilers (mypyc)
+    settings_file: str
+    _loaded_mtime_ns: Optional[int]
+    _last_hash: Optional[bytes]
+    _save_timer: Optional[threading.Timer]
+    _save_lock: threading.Lock
+    _snapshot_version: int
+    _analytics_config: Optional[Dict[str, Any]]
+    clock_tick: int
+
+    screen_width: int
+    screen_height: int
+    bg_color: Tuple[int, int, int]
+
+    mqtt_broker: str
+    mqtt_port: int
+    mqtt_topic: str
+    web_server_port: int
+
+    period_length: int
+    overtime_length: int
+    intermission_length: int
+    power_up_frequency: float
+    taunt_frequency: int
+
+    taunts_enabled: bool
+    random_sounds_enabled: bool
+    random_sound_min_interval: int
+    random_sound_max_interval: int
+
+    combo_goals_enabled: bool
+    combo_time_window: int
+    combo_reward_type: str
+    combo_max_stack: int
+
+    current_theme: str
+    classic_mode_theme_selection: bool
+
+    gpio_pins: Dict[str, int]
+
+    show_analytics_overlay: bool
+
+    # Saves requested within this window are coalesced into one write
+    SAVE_DEBOUNCE_SECONDS = 0.5
+
+    def __init__(self) -> None:
         self.settings_file = 'settings.json'
+        # mtime of the settings file as of the last load/save
+        self._loaded_mtime_ns = None
+        # Digest of the last payload written by save_settings
+        self._last_hash = None
+        # Pending debounced save, if any
+        self._save_timer = None
+        self._save_lock = threading.Lock()
+        # Bumped on every save so consumers can cache derived snapshots
+        self._snapshot_version = 0
+        # Don't lose a pending save on shutdown
+        atexit.register(self._flush_pending)
         # Initialize default settings
         self.initialize_defaults()
         # Load settings from file
         self.load_settings()
 
-    def initialize_defaults(self):
-        # Screen settings
-        self.screen_width = 1480
-        self.screen_height = 320
-        self.bg_color = (0, 0, 0)
-
-        # Network settings
-        self.mqtt_broker = 'localhost'
-        self.mqtt_port = 1883
-        self.mqtt_topic = 'bubble_hockey/game_status'
-        self.web_server_port = 5000
-
-        # Game settings
-        self.period_length = 180
-        self.overtime_length = 180
-        self.intermission_length = 60
-        self.power_up_frequency = 30
-        self.taunt_frequency = 60
-
-        # Sound settings
-        self.taunts_enabled = True
-        self.random_sounds_enabled = True
-        self.random_sound_min_interval = 5   # Minimum interval in seconds
-        self.random_sound_max_interval = 30  # Maximum interval in seconds
-
-        # Combo goal settings
-        self.combo_goals_enabled = True
-        self.combo_time_window = 30
-        self.combo_reward_type = 'extra_point'  # Options: 'extra_point', 'power_up'
-        self.combo_max_stack = 5
-
-        # Theme settings
-        self.current_theme = 'default'
-        self.classic_mode_theme_selection = False
-
-        # GPIO pin configurations
-        self.gpio_pins = {
-            'goal_sensor_red': 17,
-            'goal_sensor_blue': 27,
-            'puck_sensor_red': 22,
-            'puck_sensor_blue': 23
-        }
+    def initialize_defaults(self) -> None:
+        for name, default, field_type in FIELDS:
+            # Copy mutable defaults so instances don't share them
+            setattr(self, name, dict(default) if isinstance(default, dict) else default)
 
         # Analytics settings
-        self.show_analytics_overlay = True
-        self.analytics_config = {
+        self._analytics_config = None  # Built on first access
+
+        # Other settings
+        self.clock_tick = 0  # To store clock tick time for animations
+
+    @staticmethod
+    def _default_analytics_config() -> Dict[str, Any]:
+        """Build the default analytics configuration."""
+        return {
             # Data requirements
             'min_games_basic': 30,        # Minimum games for basic analytics
             'min_games_advanced': 300,    # Minimum games for advanced analytics
@@ -97,114 +212,150 @@ class Settings:
             }
         }
 
-        # Other settings
-        self.clock_tick = 0  # To store clock tick time for animations
+    @property
+    def analytics_config(self) -> Dict[str, Any]:
+        """Analytics configuration, defaulted lazily on first access."""
+        if self._analytics_config is None:
+            self._analytics_config = self._default_analytics_config()
+        return self._analytics_config
+
+    @analytics_config.setter
+    def analytics_config(self, value: Dict[str, Any]) -> None:
+        self._analytics_config = value
+        self._snapshot_version += 1
+
+    @property
+    def snapshot_version(self) -> int:
+        """Counter bumped by save_settings and by assigning analytics_config.
+
+        Plain field assignments don't bump it (attribute writes stay hook
+        free); changing the analytics_config dict in place must be followed
+        by save_settings.
+        """
+        return self._snapshot_version
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the public settings as a plain dict (for templates)."""
+        data = {
+            name: getattr(self, name)
+            for name in self.__slots__
+            if not name.startswith('_')
+        }
+        # Copied so a cached snapshot can't see later in-place edits
+        data['analytics_config'] = copy.deepcopy(self.analytics_config)
+        return data
+
+    def load_settings(self) -> None:
+        try:
+            st = os.stat(self.settings_file)
+        except FileNotFoundError:
+            st = None
 
-    def load_settings(self):
-        if os.path.exists(self.settings_file):
+        if st is not None:
+            # Skip re-parsing when the file has not changed since the last load
+            if st.st_mtime_ns == self._loaded_mtime_ns:
+                return
             try:
-                with open(self.settings_file, 'r') as f:
-                    data = json.load(f)
-                    # Load settings from JSON
-                    # Screen settings
-                    self.screen_width = data.get('screen_width', self.screen_width)
-                    self.screen_height = data.get('screen_height', self.screen_height)
-                    self.bg_color = tuple(data.get('bg_color', self.bg_color))
-
-                    # Network settings
-                    self.mqtt_broker = data.get('mqtt_broker', self.mqtt_broker)
-                    self.mqtt_port = data.get('mqtt_port', self.mqtt_port)
-                    self.mqtt_topic = data.get('mqtt_topic', self.mqtt_topic)
-                    self.web_server_port = data.get('web_server_port', self.web_server_port)
-
-                    # Game settings
-                    self.period_length = data.get('period_length', self.period_length)
-                    self.overtime_length = data.get('overtime_length', self.overtime_length)
-                    self.intermission_length = data.get('intermission_length', self.intermission_length)
-                    self.power_up_frequency = data.get('power_up_frequency', self.power_up_frequency)
-                    self.taunt_frequency = data.get('taunt_frequency', self.taunt_frequency)
-
-                    # Sound settings
-                    self.taunts_enabled = data.get('taunts_enabled', self.taunts_enabled)
-                    self.random_sounds_enabled = data.get('random_sounds_enabled', self.random_sounds_enabled)
-                    self.random_sound_min_interval = data.get('random_sound_min_interval', self.random_sound_min_interval)
-                    self.random_sound_max_interval = data.get('random_sound_max_interval', self.random_sound_max_interval)
-
-                    # Combo goal settings
-                    self.combo_goals_enabled = data.get('combo_goals_enabled', self.combo_goals_enabled)
-                    self.combo_time_window = data.get('combo_time_window', self.combo_time_window)
-                    self.combo_reward_type = data.get('combo_reward_type', self.combo_reward_type)
-                    self.combo_max_stack = data.get('combo_max_stack', self.combo_max_stack)
-
-                    # Theme settings
-                    self.current_theme = data.get('current_theme', self.current_theme)
-                    self.classic_mode_theme_selection = data.get('classic_mode_theme_selection', self.classic_mode_theme_selection)
-
-                    # GPIO pin configurations
-                    self.gpio_pins = data.get('gpio_pins', self.gpio_pins)
-
-                    # Analytics settings
-                    self.show_analytics_overlay = data.get('show_analytics_overlay', self.show_analytics_overlay)
-                    if 'analytics_config' in data:
-                        self.analytics_config.update(data['analytics_config'])
-
-                    # Ensure min interval is not greater than max interval
-                    if self.random_sound_min_interval > self.random_sound_max_interval:
-                        logging.warning("random_sound_min_interval is greater than random_sound_max_interval. Adjusting values.")
-                        self.random_sound_min_interval, self.random_sound_max_interval = self.random_sound_max_interval, self.random_sound_min_interval
+                cached = _SETTINGS_CACHE.get(self.settings_file)
+                if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                    data = cached[2]
+                else:
+                    with open(self.settings_file, 'rb') as f:
+                        data = _json_loads(f.read())
+                    _SETTINGS_CACHE[self.settings_file] = (st.st_mtime_ns, st.st_size, data)
+
+                self._apply_settings_data(data)
+                self._loaded_mtime_ns = st.st_mtime_ns
 
             except json.JSONDecodeError as e:
                 logging.error(f'Error decoding settings file: {e}')
+                # Nothing was applied from the bad file, so the current
+                # (default) values are intact; just rewrite a clean file
                 logging.info('Using default settings.')
-                self.initialize_defaults()
-                self.save_settings()
+                self._write_settings()
         else:
             # Save default settings if file doesn't exist
-            self.save_settings()
+            self._write_settings()
+
+    def _apply_settings_data(self, data: Dict[str, Any]) -> None:
+        """Apply parsed settings data; mutable values are copied, as data may be cached."""
+        for name, value in data.items():
+            field_type = _FIELD_TYPES.get(name)
+            if field_type is None:
+                continue
+            if field_type is tuple:
+                value = tuple(value)
+            elif field_type is dict:
+                value = copy.deepcopy(value)
+            setattr(self, name, value)
+
+        if 'analytics_config' in data:
+            self.analytics_config.update(copy.deepcopy(data['analytics_config']))
+
+        # Ensure min interval is not greater than max interval
+        if self.random_sound_min_interval > self.random_sound_max_interval:
+            logging.warning("random_sound_min_interval is greater than random_sound_max_interval. Adjusting values.")
+            self.random_sound_min_interval, self.random_sound_max_interval = self.random_sound_max_interval, self.random_sound_min_interval
+
+    def save_settings(self) -> None:
+        """Schedule a settings write, coalescing saves made in quick succession."""
+        with self._save_lock:
+            self._snapshot_version += 1
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(self.SAVE_DEBOUNCE_SECONDS, self._flush_from_timer)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush_settings(self) -> None:
+        """Write the settings file now, cancelling any pending debounced save."""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            self._write_settings()
+
+    def _flush_from_timer(self) -> None:
+        """Run a debounced save, logging failures the timer thread would swallow."""
+        try:
+            self.flush_settings()
+        except OSError as e:
+            logging.error(f"Error saving settings: {e}")
 
-    def save_settings(self):
+    def _flush_pending(self) -> None:
+        """Write the settings file only if a debounced save is pending."""
+        if self._save_timer is not None:
+            self.flush_settings()
+
+    def _write_settings(self) -> None:
+        """Atomically write the settings file, skipping unchanged payloads."""
         data = {
-            # Screen settings
-            'screen_width': self.screen_width,
-            'screen_height': self.screen_height,
-            'bg_color': list(self.bg_color),
-
-            # Network settings
-            'mqtt_broker': self.mqtt_broker,
-            'mqtt_port': self.mqtt_port,
-            'mqtt_topic': self.mqtt_topic,
-            'web_server_port': self.web_server_port,
-
-            # Game settings
-            'period_length': self.period_length,
-            'overtime_length': self.overtime_length,
-            'intermission_length': self.intermission_length,
-            'power_up_frequency': self.power_up_frequency,
-            'taunt_frequency': self.taunt_frequency,
-
-            # Sound settings
-            'taunts_enabled': self.taunts_enabled,
-            'random_sounds_enabled': self.random_sounds_enabled,
-            'random_sound_min_interval': self.random_sound_min_interval,
-            'random_sound_max_interval': self.random_sound_max_interval,
-
-            # Combo goal settings
-            'combo_goals_enabled': self.combo_goals_enabled,
-            'combo_time_window': self.combo_time_window,
-            'combo_reward_type': self.combo_reward_type,
-            'combo_max_stack': self.combo_max_stack,
-
-            # Theme settings
-            'current_theme': self.current_theme,
-            'classic_mode_theme_selection': self.classic_mode_theme_selection,
-
-            # GPIO pin configurations
-            'gpio_pins': self.gpio_pins,
-
-            # Analytics settings
-            'show_analytics_overlay': self.show_analytics_overlay,
-            'analytics_config': self.analytics_config
+            name: list(getattr(self, name)) if field_type is tuple else getattr(self, name)
+            for name, field_type in _FIELD_TYPES.items()
         }
-        
-        with open(self.settings_file, 'w') as f:
-            json.dump(data, f, indent=4)
+        data['analytics_config'] = self.analytics_config
+
+        payload = _json_dumps(data)
+        digest = hashlib.blake2b(payload, digest_size=8).digest()
+
+        # Skip the write if nothing changed and the file is still ours
+        if digest == self._last_hash:
+            try:
+                if os.stat(self.settings_file).st_mtime_ns == self._loaded_mtime_ns:
+                    return
+            except FileNotFoundError:
+                pass
+
+        # Write to a temp file and swap it in so a crash can't leave a torn file
+        tmp_file = self.settings_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.settings_file)
+
+        st = os.stat(self.settings_file)
+        self._last_hash = digest
+        self._loaded_mtime_ns = st.st_mtime_ns
+        # Other instances can pick up the new contents without re-parsing
+        _SETTINGS_CACHE[self.settings_file] = (st.st_mtime_ns, st.st_size, copy.deepcopy(data))
@@ -2,10 +2,33 @@
 
 import pygame
 import logging
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Number of worker threads used for bulk asset loading
+ASSET_LOAD_WORKERS = 4
+
+# Shared by every bulk load so a theme's sound sets don't each spin up
+# (and tear down) their own threads
+_asset_pool = ThreadPoolExecutor(max_workers=ASSET_LOAD_WORKERS, thread_name_prefix='asset-load')
+
+# Theme assets are cached by (path, mtime) so theme switches reuse them;
+# failures raise inside the cached helpers and so are never cached. Callers
+# mutate what they get back (set_alpha, set_volume), so the cache keeps the
+# raw decoded data and every call returns a fresh Surface or Sound built
+# from it.
+@functools.lru_cache(maxsize=128)
+def _decode_image_cached(path, mtime_ns):
+    return pygame.image.load(path)
+
+@functools.lru_cache(maxsize=128)
+def _load_sound_cached(path, mtime_ns):
+    return pygame.mixer.Sound(path).get_raw()
 
 def load_image(path):
     try:
-        image = pygame.image.load(path).convert_alpha()
+        image = _decode_image_cached(path, os.stat(path).st_mtime_ns).convert_alpha()
         return image
     except Exception as e:
         logging.error(f'Failed to load image {path}: {e}')
@@ -13,8 +36,46 @@ def load_image(path):
 
 def load_sound(path):
     try:
-        sound = pygame.mixer.Sound(path)
+        sound = pygame.mixer.Sound(buffer=_load_sound_cached(path, os.stat(path).st_mtime_ns))
         return sound
     except Exception as e:
         logging.error(f'Failed to load sound {path}: {e}')
         return None
+
+def clear_asset_cache():
+    """Drop all cached images and sounds (e.g. from an admin action)."""
+    _decode_image_cached.cache_clear()
+    _load_sound_cached.cache_clear()
+
+def _read_image(path):
+    """Read and decode an image file without converting it for the display."""
+    try:
+        return pygame.image.load(path)
+    except Exception as e:
+        logging.error(f'Failed to load image {path}: {e}')
+        return None
+
+def load_images_bulk(paths):
+    """Load several images concurrently, returning them in the order given.
+
+    Disk reads and decoding run in worker threads; convert_alpha() must run
+    on the display thread, so it is done here once all files are read.
+    These are one-off animation frames, so they bypass the asset cache
+    rather than holding a second decoded copy of each.
+    """
+    decoded = list(_asset_pool.map(_read_image, paths))
+
+    images = []
+    for path, image in zip(paths, decoded):
+        if image is not None:
+            try:
+                image = image.convert_alpha()
+            except Exception as e:
+                logging.error(f'Failed to load image {path}: {e}')
+                image = None
+        images.append(image)
+    return images
+
+def load_sounds_bulk(paths):
+    """Load several sounds concurrently, returning them in the order given."""
+    return list(_asset_pool.map(load_sound, paths))
@@ -1,43 +1,344 @@
 # web_server.py
 
-from flask import Flask, render_template, request, redirect, url_for, jsonify
+from flask import Flask, render_template, request, redirect, url_for, jsonify, send_from_directory, abort, stream_with_context
 import threading
 import logging
+import logging.handlers
+import queue
+import atexit
 import os
 import json
+import hashlib
+import shutil
+import re
+import functools
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from types import MappingProxyType
+from settings import Settings
 from werkzeug.utils import secure_filename
+from werkzeug.security import safe_join
+from flask.json.provider import DefaultJSONProvider
+from jinja2 import FileSystemBytecodeCache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider that encodes and decodes with orjson."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(
+            obj, default=self.default, option=orjson.OPT_NON_STR_KEYS
+        ).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
+if orjson is not None:
+    # jsonify() and request.get_json() go through orjson
+    app.json = ORJSONProvider(app)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # Max upload size: 16MB
+# Templates only change on deploy: skip the per-render mtime check and keep
+# compiled bytecode on disk (system temp dir) for fast cold starts
+app.config['TEMPLATES_AUTO_RELOAD'] = False
+app.jinja_options = {**app.jinja_options, 'bytecode_cache': FileSystemBytecodeCache()}
+# Enable when running behind nginx with an internal location, e.g.:
+#   location /internal_themes/ { internal; alias /path/to/bubble_hockey/assets/themes/; }
+# Theme assets are then sent by nginx via X-Accel-Redirect instead of Python.
+app.config['THEME_ASSET_ACCEL_REDIRECT'] = False
+# Behind Apache/lighttpd, set to emit X-Sendfile headers from send_file()
+# instead of streaming file contents through Python.
+app.config['USE_X_SENDFILE'] = False
+
+# Compress JSON and HTML responses (brotli preferred, gzip fallback)
+app.config['COMPRESS_MIMETYPES'] = ['application/json', 'text/html', 'text/css']
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 256
+if Compress is not None:
+    Compress(app)
 
 # Global references to settings and game instance
 game_settings = None
 game_instance = None
 
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'wav', 'ttf'}
+ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'wav', 'ttf'})
+_ALLOWED_SUFFIXES = tuple(f'.{ext}' for ext in sorted(ALLOWED_EXTENSIONS))
+
+# Theme upload form field prefix -> asset subdirectory within the theme
+_UPLOAD_PREFIXES = (
+    ('upload_image_', 'images'),
+    ('upload_sound_', 'sounds'),
+    ('upload_font_', 'fonts')
+)
+
+# Uploads are copied in chunks of this size; uploads at least this large are
+# also dropped from the page cache once written
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+def _parse_checkbox(value):
+    """Convert an HTML checkbox form value to a bool."""
+    return value == 'on'
+
+_RGB_RE = re.compile(r'\(?\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*\)?')
+
+def _parse_rgb(value):
+    """Parse an '(r, g, b)' form value into a color tuple, clamped to 0-255."""
+    match = _RGB_RE.fullmatch(value.strip())
+    if match is None:
+        return (0, 0, 0)  # Default color
+    return tuple(min(255, int(channel)) for channel in match.groups())
+
+# Form value coercer for each persisted setting, precomputed from Settings.TYPES
+_FORM_COERCERS = {bool: _parse_checkbox, tuple: _parse_rgb}
+_FIELD_COERCERS = {
+    name: _FORM_COERCERS.get(field_type, field_type)
+    for name, field_type in Settings.TYPES.items()
+}
+
+# Settings editable from each settings page
+_GAME_SETTINGS_KEYS = frozenset((
+    'period_length', 'overtime_length', 'intermission_length',
+    'power_up_frequency', 'taunt_frequency',
+    'taunts_enabled', 'random_sounds_enabled',
+    'random_sound_min_interval', 'random_sound_max_interval',
+    'combo_goals_enabled', 'combo_time_window',
+    'combo_reward_type', 'combo_max_stack',
+    'show_analytics_overlay'
+))
+_SYSTEM_SETTINGS_KEYS = frozenset((
+    'screen_width', 'screen_height', 'bg_color',
+    'mqtt_broker', 'mqtt_port', 'mqtt_topic',
+    'web_server_port', 'classic_mode_theme_selection'
+))
+
+# analytics_config entries editable from the system settings page, keyed by
+# form field name
+_ANALYTICS_SYSTEM_FIELDS = {
+    f'analytics_{key}': (key, coerce) for key, coerce in (
+        ('min_games_basic', int),
+        ('min_games_advanced', int),
+        ('momentum_window', int),
+        ('quick_response_window', int),
+        ('scoring_run_threshold', int),
+        ('cache_size', int),
+        ('critical_moment_threshold', float),
+        ('close_game_threshold', int)
+    )
+}
+
+# analytics_config entries on the analytics page as (key, coercer, default)
+_ANALYTICS_FORM_FIELDS = (
+    # Data requirements
+    ('min_games_basic', int, 30),
+    ('min_games_advanced', int, 300),
+    # Time windows
+    ('momentum_window', int, 60),
+    ('quick_response_window', int, 30),
+    ('scoring_run_threshold', int, 3),
+    # Game analysis
+    ('critical_moment_threshold', float, 60.0),
+    ('close_game_threshold', int, 2),
+    # Display settings
+    ('overlay_position', str, 'top-left'),
+    ('overlay_opacity', float, 0.8)
+)
+_ANALYTICS_FORM_CHECKBOXES = ('show_predictions', 'show_patterns', 'show_momentum')
+# Per-mode overlay checkboxes as (form field, analytics_config mode key)
+_ANALYTICS_MODE_CHECKBOXES = (
+    ('classic_analytics', 'classic_mode'),
+    ('evolved_analytics', 'evolved_mode'),
+    ('crazy_analytics', 'crazy_play_mode')
+)
+
+# Serializes settings mutation + save across request threads
+_settings_lock = threading.Lock()
+
+# Last settings snapshot for templates as (settings state, read-only view)
+_settings_snapshot = (None, None)
+
+# Persisted fields that identify the rendered settings pages, along with
+# snapshot_version (which covers analytics_config). Dict fields aren't
+# shown on the pages and aren't hashable.
+_SETTINGS_STATE_FIELDS = tuple(
+    name for name, field_type in Settings.TYPES.items() if field_type is not dict
+)
+
+# Asset directory listings as directory -> (time.monotonic() stamp,
+# directory st_mtime_ns, assets). A listing is reused while the directory's
+# mtime is unchanged; the TTL bounds staleness for changes in nested
+# subdirectories, which don't touch the top-level mtime. The TTL can be
+# overridden with analytics_config['asset_listing_ttl'].
+ASSET_LISTING_TTL = 30.0
+_LISTING_CACHE = {}
+
+# Serialized /game_data payload as (time.monotonic() stamp, body, etag);
+# polls within GAME_DATA_TTL seconds reuse it instead of rebuilding stats.
+GAME_DATA_TTL = 0.1
+_game_data_cache = (0.0, None, None)
+
+# Worker threads for the waitress server
+WEB_SERVER_THREADS = 8
+
+# /game_data/stream is opt-in; the live page polls /game_data with ETags.
+# Every open stream occupies a server worker thread for as long as the client
+# stays connected (it reconnects after GAME_DATA_STREAM_MAX_AGE), so at most
+# GAME_DATA_MAX_STREAMS run at once, well below WEB_SERVER_THREADS; extra
+# clients get a 503 and should poll instead.
+GAME_DATA_STREAM_INTERVAL = 0.5
+GAME_DATA_STREAM_MAX_AGE = 60.0
+GAME_DATA_MAX_STREAMS = 2
+_stream_slots = threading.BoundedSemaphore(GAME_DATA_MAX_STREAMS)
+
+# Theme directory listing, invalidated when the themes dir mtime changes
+_THEMES_CACHE = {'mtime': 0, 'list': []}
+
+# Runs the theme manager's directory scans concurrently so slow storage
+# (SD cards) costs the slowest scan rather than the sum of all of them
+SCAN_WORKERS = 4
+_SCAN_POOL = ThreadPoolExecutor(max_workers=SCAN_WORKERS, thread_name_prefix='asset-scan')
+atexit.register(_SCAN_POOL.shutdown, wait=False)
 
 def allowed_file(filename):
     """Check if the file extension is allowed."""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return filename.lower().endswith(_ALLOWED_SUFFIXES)
+
+def _json_dumps(obj, pretty=False):
+    """Serialize obj to JSON bytes, using orjson when it is available."""
+    if orjson is None:
+        return json.dumps(obj, indent=2 if pretty else None).encode()
+    option = orjson.OPT_NON_STR_KEYS
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, option=option)
+
+def _json_response(obj):
+    """Build a JSON response, serializing with orjson when it is available."""
+    if orjson is None:
+        return jsonify(obj)
+    return app.response_class(_json_dumps(obj), mimetype='application/json')
+
+def _settings_state():
+    """Hashable key that changes whenever the rendered settings would."""
+    return (game_settings.snapshot_version,) + tuple(
+        getattr(game_settings, name) for name in _SETTINGS_STATE_FIELDS
+    )
+
+def get_settings_snapshot():
+    """Get a read-only view of the current settings, rebuilt only when they change."""
+    global _settings_snapshot
+    state = _settings_state()
+    if _settings_snapshot[0] != state:
+        # Shared across requests, so hand templates a read-only view
+        _settings_snapshot = (state, MappingProxyType(game_settings.as_dict()))
+    return _settings_snapshot[1]
+
+def get_analytics_config_view():
+    """Get a read-only view of the live analytics config for templates."""
+    return MappingProxyType(game_settings.analytics_config)
+
+@functools.lru_cache(maxsize=512)
+def _secure_filename(filename):
+    """Memoized secure_filename() for repeated theme and upload names."""
+    return secure_filename(filename)
+
+def save_upload(file, dest):
+    """Save an uploaded file, copying it in UPLOAD_CHUNK_SIZE chunks."""
+    # FileStorage.save() copies with a 16 KiB buffer; one big buffer means
+    # far fewer read/write calls per upload. The file stays buffered: chunks
+    # this large pass straight through, and unlike a raw file, a short
+    # write() is retried instead of silently dropping bytes.
+    with open(dest, 'wb') as dst:
+        shutil.copyfileobj(file.stream, dst, length=UPLOAD_CHUNK_SIZE)
+        if dst.tell() >= UPLOAD_CHUNK_SIZE and hasattr(os, 'posix_fadvise'):
+            # Large write-once asset: flush it, then keep it out of the page cache
+            dst.flush()
+            os.fdatasync(dst.fileno())
+            os.posix_fadvise(dst.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+def get_available_themes(themes_dir):
+    """Get list of theme directories, re-reading only when the directory changes."""
+    mtime = os.stat(themes_dir).st_mtime_ns
+    if mtime != _THEMES_CACHE['mtime']:
+        # DirEntry.is_dir() uses the readdir file type, avoiding a stat per entry
+        with os.scandir(themes_dir) as entries:
+            _THEMES_CACHE['list'] = [entry.name for entry in entries if entry.is_dir()]
+        _THEMES_CACHE['mtime'] = mtime
+    return _THEMES_CACHE['list']
+
+def _iter_assets(directory):
+    """Yield allowed asset paths under directory, relative to directory."""
+    # Explicit stack instead of recursion: no generator chain per nesting level
+    stack = [(directory, '')]
+    while stack:
+        path, prefix = stack.pop()
+        try:
+            entries = os.scandir(path)
+        except OSError:
+            continue
+        # DirEntry caches the file type from readdir, so no extra stat per entry
+        with entries:
+            for entry in entries:
+                name = entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, os.path.join(prefix, name)))
+                    continue
+                # allowed_file() inlined for the per-entry hot path
+                if name.lower().endswith(_ALLOWED_SUFFIXES) and entry.is_file():
+                    yield os.path.join(prefix, name)
 
 def get_available_assets(directory):
-    """Get list of available assets in a directory."""
-    assets = []
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if allowed_file(file):
-                asset_path = os.path.relpath(os.path.join(root, file), directory)
-                assets.append(asset_path)
+    """Get list of available assets in a directory, cached by mtime and TTL."""
+    ttl = ASSET_LISTING_TTL
+    if game_settings is not None:
+        ttl = game_settings.analytics_config.get('asset_listing_ttl', ttl)
+        
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+    except OSError:
+        return []
+        
+    now = time.monotonic()
+    cached = _LISTING_CACHE.get(directory)
+    if cached and cached[1] == mtime and now - cached[0] < ttl:
+        return cached[2]
+        
+    assets = list(_iter_assets(directory))
+    _LISTING_CACHE[directory] = (now, mtime, assets)
     return assets
 
 @app.route('/')
 def index():
-    return render_template('index.html')
+    return _render_static_page('index.html')
+
+@functools.lru_cache(maxsize=None)
+def _render_static_page(template_name):
+    """Render a template that takes no context once and reuse the HTML."""
+    return render_template(template_name)
+
+@functools.lru_cache(maxsize=8)
+def _render_settings_page(template_name, settings_state):
+    """Render a settings page, reusing the HTML until the settings change."""
+    return render_template(
+        template_name,
+        settings=get_settings_snapshot(),
+        analytics_config=get_analytics_config_view()
+    )
 
 @app.route('/game')
 def game():
-    return render_template('game.html')
+    # The page is a static shell; live stats are filled in from /game_data
+    return _render_static_page('game.html')
 
 @app.route('/game_data')
 def game_data():
@@ -45,6 +346,76 @@ def game_data():
     if not game_instance:
         return jsonify({'error': 'Game not initialized'})
         
+    body, etag = _get_game_data_payload()
+    
+    # Most polls see unchanged data; let the client revalidate with its ETag.
+    # The 304 repeats the validator and caching headers the 200 carried.
+    matched = _matching_etag(etag)
+    if matched is not None:
+        response = app.response_class(status=304)
+        response.set_etag(matched)
+    else:
+        response = app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/game_data/stream')
+def game_data_stream():
+    """Push game data as server-sent events when it changes (opt-in, capped)."""
+    if not game_instance:
+        return jsonify({'error': 'Game not initialized'})
+        
+    if not _stream_slots.acquire(blocking=False):
+        response = jsonify({'error': 'Too many live streams; poll /game_data instead'})
+        response.status_code = 503
+        return response
+        
+    def generate():
+        last_etag = None
+        deadline = time.monotonic() + GAME_DATA_STREAM_MAX_AGE
+        while time.monotonic() < deadline:
+            body, etag = _get_game_data_payload()
+            if etag != last_etag:
+                last_etag = etag
+                yield b'data: ' + body + b'\n\n'
+            time.sleep(GAME_DATA_STREAM_INTERVAL)
+            
+    response = app.response_class(generate(), mimetype='text/event-stream')
+    # Runs when the server closes the response, even if the generator never started
+    response.call_on_close(_stream_slots.release)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Don't let nginx buffer events
+    return response
+
+def _matching_etag(etag):
+    """Return the If-None-Match tag matching etag, including compressed variants.
+
+    Flask-Compress rewrites a strong ETag to "<etag>:<algorithm>" on the
+    responses it compresses, and that suffixed tag is what browsers send back.
+    It leaves 304s alone, so the matched tag is returned for the 304 to echo.
+    """
+    if_none_match = request.if_none_match
+    if if_none_match.star_tag:
+        return etag
+    for tag in if_none_match:
+        if tag.partition(':')[0] == etag:
+            return tag
+    return None
+
+def _get_game_data_payload():
+    """Get the serialized game data and its ETag, rebuilt at most every GAME_DATA_TTL."""
+    global _game_data_cache
+    stamp, body, etag = _game_data_cache
+    now = time.monotonic()
+    if body is None or now - stamp >= GAME_DATA_TTL:
+        body = _json_dumps(_build_game_data())
+        etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+        _game_data_cache = (now, body, etag)
+    return body, etag
+
+def _build_game_data():
+    """Build the live game stats dict served by /game_data."""
     # Get basic game status
     stats = game_instance.get_game_status()
     
@@ -60,8 +431,25 @@ def game_data():
                 'timing_patterns': game_instance.current_analysis['patterns'].get('timing_patterns', {})
             }
         }
-    
-    return jsonify(stats)
+    return stats
+
+@app.route('/theme_asset/<path:asset_path>')
+def theme_asset(asset_path):
+    """Serve a theme asset file (image, sound or font)."""
+    themes_dir = os.path.abspath('assets/themes/')
+    full_path = safe_join(themes_dir, asset_path)
+    if full_path is None or not os.path.isfile(full_path):
+        abort(404)
+        
+    if app.config['THEME_ASSET_ACCEL_REDIRECT']:
+        # Let the reverse proxy stream the file with sendfile(2)
+        response = app.response_class()
+        response.headers['X-Accel-Redirect'] = '/internal_themes/' + asset_path
+        return response
+        
+    # Conditional: answers If-None-Match / If-Modified-Since with a 304, and
+    # hands the open file to the server's wsgi.file_wrapper otherwise
+    return send_from_directory(themes_dir, asset_path, conditional=True)
 
 @app.route('/analytics/<int:game_id>')
 def get_game_analytics(game_id):
@@ -70,173 +458,201 @@ def get_game_analytics(game_id):
         return jsonify({'error': 'Database not initialized'})
         
     try:
-        # Get analytics history
-        analytics_history = game_instance.db.get_analytics_history(game_id)
-        
-        # Get scoring patterns
-        scoring_patterns = game_instance.db.get_scoring_patterns(game_id)
-        
-        # Get game stats
-        game_stats = game_instance.db.get_game_stats(game_id)
-        
-        return jsonify({
-            'analytics_history': analytics_history,
-            'scoring_patterns': scoring_patterns,
-            'game_stats': game_stats
-        })
+        version = game_instance.db.get_analytics_version(game_id)
+        if version is None:
+            # Unknown game or DB error: nothing worth caching
+            return _json_response(_build_game_analytics(game_id))
+        body = _game_analytics_body(game_id, version)
+        return app.response_class(body, mimetype='application/json')
     except Exception as e:
-        logging.error(f"Error getting game analytics: {e}")
+        logging.error("Error getting game analytics: %s", e)
         return jsonify({'error': 'Failed to retrieve analytics data'})
 
+def _build_game_analytics(game_id):
+    """Build the analytics dict for a game from the database.
+
+    Raises if the read fails; lru_cache doesn't store exceptions, so a
+    transient error is retried on the next request instead of memoized.
+    """
+    data = game_instance.db.get_full_analytics(game_id)
+    if data is None:
+        raise RuntimeError(f'Failed to read analytics for game {game_id}')
+    return data
+
+@functools.lru_cache(maxsize=256)
+def _game_analytics_body(game_id, version):
+    """Serialized analytics for a game, memoized per data version."""
+    return _json_dumps(_build_game_analytics(game_id))
+
+def _iter_json_array(items):
+    """Yield a JSON array chunk by chunk from an iterable of items."""
+    yield b'['
+    first = True
+    for item in items:
+        if not first:
+            yield b','
+        first = False
+        yield _json_dumps(item)
+    yield b']'
+
+def _prime_rows(rows):
+    """Fetch the first row up front so query errors surface before streaming starts."""
+    rows = iter(rows)
+    try:
+        first = next(rows)
+    except StopIteration:
+        return iter(())
+    return itertools.chain((first,), rows)
+
 @app.route('/analytics/download/<int:game_id>')
 def download_analytics(game_id):
-    """Download analytics data for a game as JSON"""
+    """Download analytics data for a game as JSON, or NDJSON with ?format=ndjson"""
     if not game_instance or not game_instance.db:
         return jsonify({'error': 'Database not initialized'})
         
+    db = game_instance.db
+    
     try:
-        # Get all analytics data
-        analytics_history = game_instance.db.get_analytics_history(game_id)
-        scoring_patterns = game_instance.db.get_scoring_patterns(game_id)
-        game_stats = game_instance.db.get_game_stats(game_id)
+        game_stats = db.get_game_stats(game_id)
+        if not game_stats:
+            return jsonify({'error': 'Game not found'}), 404
+        analytics_history = _prime_rows(db.iter_analytics_history(game_id))
+        scoring_patterns = _prime_rows(db.iter_scoring_patterns(game_id))
+    except Exception as e:
+        logging.error("Error exporting analytics data: %s", e)
+        return jsonify({'error': 'Failed to export analytics data'}), 500
+    
+    if request.args.get('format') == 'ndjson':
+        return _download_analytics_ndjson(game_id, game_stats, analytics_history, scoring_patterns)
         
-        data = {
-            'game_id': game_id,
-            'analytics_history': analytics_history,
-            'scoring_patterns': scoring_patterns,
-            'game_stats': game_stats,
-            'export_date': datetime.now().isoformat()
-        }
+    def generate():
+        # Streamed so the (potentially long) history is never held in memory.
+        # A database error past this point propagates and aborts the response,
+        # leaving the client with truncated, unparseable JSON rather than a
+        # valid but shortened document.
+        yield b'{"game_id":' + _json_dumps(game_id)
+        yield b',"analytics_history":'
+        yield from _iter_json_array(analytics_history)
+        yield b',"scoring_patterns":'
+        yield from _iter_json_array(scoring_patterns)
+        yield b',"game_stats":' + _json_dumps(game_stats)
+        yield b',"export_date":' + _json_dumps(datetime.now().isoformat())
+        yield b'}'
         
-        return jsonify(data)
-    except Exception as e:
-        logging.error(f"Error exporting analytics data: {e}")
-        return jsonify({'error': 'Failed to export analytics data'})
+    return app.response_class(stream_with_context(generate()), mimetype='application/json')
+
+def _download_analytics_ndjson(game_id, game_stats, analytics_history, scoring_patterns):
+    """Stream a game's analytics as one JSON object per line.
+
+    The last line is always a footer, {"complete": true} or {"error": ...},
+    so readers can tell a finished export from a truncated one.
+    """
+    def generate():
+        yield _json_dumps({
+            'game_id': game_id,
+            'export_date': datetime.now().isoformat(),
+            'game_stats': game_stats
+        }) + b'\n'
+        try:
+            for row in analytics_history:
+                yield _json_dumps({'analytics_history': row}) + b'\n'
+            for row in scoring_patterns:
+                yield _json_dumps({'scoring_patterns': row}) + b'\n'
+        except Exception as e:
+            logging.error("Error streaming analytics data: %s", e)
+            yield _json_dumps({'error': 'Failed to export analytics data'}) + b'\n'
+        else:
+            yield _json_dumps({'complete': True}) + b'\n'
+            
+    response = app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+    response.headers['Content-Disposition'] = f'attachment; filename=game_{game_id}.ndjson'
+    return response
+
+def _apply_form_settings(form, keys):
+    """Set the submitted settings among keys, skipping values that don't parse."""
+    for key in form.keys() & keys:
+        value = form[key]
+        try:
+            setattr(game_settings, key, _FIELD_COERCERS[key](value))
+        except ValueError:
+            logging.error("Invalid value for setting %s: %s", key, value)
 
 @app.route('/settings', methods=['GET', 'POST'])
 def settings_route():
     """Handle game settings configuration."""
     if request.method == 'POST':
-        # Update game settings
-        for key in [
-            'period_length', 'overtime_length', 'intermission_length',
-            'power_up_frequency', 'taunt_frequency',
-            'taunts_enabled', 'random_sounds_enabled',
-            'random_sound_min_interval', 'random_sound_max_interval',
-            'combo_goals_enabled', 'combo_time_window', 
-            'combo_reward_type', 'combo_max_stack',
-            'show_analytics_overlay'
-        ]:
-            value = request.form.get(key)
-            if value is not None and hasattr(game_settings, key):
-                attr_type = type(getattr(game_settings, key))
-                if attr_type is bool:
-                    setattr(game_settings, key, value == 'on')
-                elif attr_type is int:
-                    setattr(game_settings, key, int(value))
-                elif attr_type is float:
-                    setattr(game_settings, key, float(value))
-                else:
-                    setattr(game_settings, key, value)
+        with _settings_lock:
+            # Update game settings (only the fields actually submitted)
+            form = request.form
+            _apply_form_settings(form, _GAME_SETTINGS_KEYS)
                     
-        # Update analytics settings
-        analytics_config = request.form.get('analytics_config', {})
-        if analytics_config:
-            try:
-                config = json.loads(analytics_config)
-                game_settings.analytics_config.update(config)
-            except json.JSONDecodeError:
-                logging.error("Failed to parse analytics configuration")
+            # Update analytics settings
+            analytics_config = form.get('analytics_config', {})
+            if analytics_config:
+                try:
+                    config = json.loads(analytics_config)
+                    game_settings.analytics_config.update(config)
+                except json.JSONDecodeError:
+                    logging.error("Failed to parse analytics configuration")
                 
-        game_settings.save_settings()
+            game_settings.save_settings()
         logging.info('Game settings updated via web interface')
         return redirect(url_for('settings_route'))
         
-    return render_template('settings.html', 
-                         settings=vars(game_settings),
-                         analytics_config=game_settings.analytics_config 
-                         if hasattr(game_settings, 'analytics_config') else {})
+    return _render_settings_page('settings.html', _settings_state())
 
 @app.route('/system_settings', methods=['GET', 'POST'])
 def system_settings():
     """Handle system settings configuration."""
     if request.method == 'POST':
-        # Update system settings
-        for key in [
-            'screen_width', 'screen_height', 'bg_color',
-            'mqtt_broker', 'mqtt_port', 'mqtt_topic',
-            'web_server_port', 'classic_mode_theme_selection'
-        ]:
-            value = request.form.get(key)
-            if value is not None and hasattr(game_settings, key):
-                if key == 'bg_color':
-                    try:
-                        value = tuple(map(int, value.strip('()').split(',')))
-                    except:
-                        value = (0, 0, 0)  # Default color
-                elif key == 'classic_mode_theme_selection':
-                    value = value == 'on'
-                else:
-                    attr_type = type(getattr(game_settings, key))
-                    if attr_type is int:
-                        value = int(value)
-                    elif attr_type is float:
-                        value = float(value)
-                setattr(game_settings, key, value)
+        with _settings_lock:
+            # Update system settings (only the fields actually submitted)
+            form = request.form
+            _apply_form_settings(form, _SYSTEM_SETTINGS_KEYS)
                 
-        # Update analytics system settings
-        if hasattr(game_settings, 'analytics_config'):
-            for key in [
-                'min_games_basic',
-                'min_games_advanced',
-                'momentum_window',
-                'quick_response_window',
-                'scoring_run_threshold',
-                'cache_size',
-                'critical_moment_threshold',
-                'close_game_threshold'
-            ]:
-                value = request.form.get(f'analytics_{key}')
-                if value is not None:
-                    try:
-                        value = int(value) if key != 'critical_moment_threshold' else float(value)
-                        game_settings.analytics_config[key] = value
-                    except ValueError:
-                        logging.error(f"Invalid value for analytics setting {key}: {value}")
+            # Update analytics system settings
+            for field in form.keys() & _ANALYTICS_SYSTEM_FIELDS.keys():
+                key, coerce = _ANALYTICS_SYSTEM_FIELDS[field]
+                value = form[field]
+                try:
+                    game_settings.analytics_config[key] = coerce(value)
+                except ValueError:
+                    logging.error("Invalid value for analytics setting %s: %s", key, value)
                         
-        game_settings.save_settings()
+            game_settings.save_settings()
         logging.info('System settings updated via web interface')
         return redirect(url_for('system_settings'))
         
-    return render_template(
-        'system_settings.html',
-        settings=vars(game_settings),
-        analytics_config=game_settings.analytics_config if hasattr(game_settings, 'analytics_config') else {}
-    )
+    return _render_settings_page('system_settings.html', _settings_state())
 
 @app.route('/themes', methods=['GET', 'POST'])
 def theme_manager():
     """Handle theme management."""
     themes_dir = 'assets/themes/'
     assets_dir = 'assets/'
-    available_themes = [d for d in os.listdir(themes_dir) if os.path.isdir(os.path.join(themes_dir, d))]
-    available_images = get_available_assets(os.path.join(assets_dir, 'common/images'))
-    available_sounds = get_available_assets(os.path.join(assets_dir, 'common/sounds'))
-    available_fonts = get_available_assets(os.path.join(assets_dir, 'fonts'))
+    themes_future = _SCAN_POOL.submit(get_available_themes, themes_dir)
+    images_future = _SCAN_POOL.submit(get_available_assets, os.path.join(assets_dir, 'common/images'))
+    sounds_future = _SCAN_POOL.submit(get_available_assets, os.path.join(assets_dir, 'common/sounds'))
+    fonts_future = _SCAN_POOL.submit(get_available_assets, os.path.join(assets_dir, 'fonts'))
+    available_themes = themes_future.result()
+    available_images = images_future.result()
+    available_sounds = sounds_future.result()
+    available_fonts = fonts_future.result()
 
     if request.method == 'POST':
         if 'theme_name' in request.form:
             # Create a new theme
-            theme_name = secure_filename(request.form['theme_name'])
+            theme_name = _secure_filename(request.form['theme_name'])
             theme_path = os.path.join(themes_dir, theme_name)
-            if os.path.exists(theme_path):
-                logging.warning(f"Theme {theme_name} already exists.")
+            # mkdir doubles as the existence check (no separate stat)
+            try:
+                os.mkdir(theme_path)
+            except FileExistsError:
+                logging.warning("Theme %s already exists.", theme_name)
                 return redirect(url_for('theme_manager'))
                 
-            os.makedirs(theme_path, exist_ok=True)
-            os.makedirs(os.path.join(theme_path, 'images'), exist_ok=True)
-            os.makedirs(os.path.join(theme_path, 'sounds'), exist_ok=True)
-            os.makedirs(os.path.join(theme_path, 'fonts'), exist_ok=True)
+            for subdir in ('images', 'sounds', 'fonts'):
+                os.mkdir(os.path.join(theme_path, subdir))
             
             # Save theme configuration
             theme_config = {
@@ -251,47 +667,41 @@ def theme_manager():
             }
             
             # Handle asset assignments
-            for key in request.form:
+            form = request.form
+            for key in form:
                 if key.startswith('asset_'):
-                    asset_type = key.replace('asset_', '')
-                    asset_value = request.form[key]
+                    asset_value = form[key]
                     if asset_value != '':
-                        theme_config['assets'][asset_type] = asset_value
+                        theme_config['assets'][key[len('asset_'):]] = asset_value
                         
             # Handle file uploads
-            for file_field in request.files:
-                file = request.files[file_field]
-                if file and allowed_file(file.filename):
-                    filename = secure_filename(file.filename)
-                    if file_field.startswith('upload_image_'):
-                        file.save(os.path.join(theme_path, 'images', filename))
-                        asset_name = file_field.replace('upload_image_', '')
-                        theme_config['assets'][asset_name] = f'images/{filename}'
-                    elif file_field.startswith('upload_sound_'):
-                        file.save(os.path.join(theme_path, 'sounds', filename))
-                        asset_name = file_field.replace('upload_sound_', '')
-                        theme_config['assets'][asset_name] = f'sounds/{filename}'
-                    elif file_field.startswith('upload_font_'):
-                        file.save(os.path.join(theme_path, 'fonts', filename))
-                        asset_name = file_field.replace('upload_font_', '')
-                        theme_config['assets'][asset_name] = f'fonts/{filename}'
+            for file_field, file in request.files.items():
+                for prefix, subdir in _UPLOAD_PREFIXES:
+                    if file_field.startswith(prefix):
+                        if file and allowed_file(file.filename):
+                            filename = _secure_filename(file.filename)
+                            save_upload(file, os.path.join(theme_path, subdir, filename))
+                            theme_config['assets'][file_field[len(prefix):]] = f'{subdir}/{filename}'
+                        break
             
             # Save theme configuration
-            with open(os.path.join(theme_path, 'theme.json'), 'w') as f:
-                json.dump(theme_config, f, indent=4)
+            with open(os.path.join(theme_path, 'theme.json'), 'wb') as f:
+                f.write(_json_dumps(theme_config, pretty=True))
                 
-            logging.info(f'Theme {theme_name} created via web interface')
+            _LISTING_CACHE.clear()
+            logging.info('Theme %s created via web interface', theme_name)
             return redirect(url_for('theme_manager'))
             
         elif 'selected_theme' in request.form:
             # Activate an existing theme
             selected_theme = request.form.get('selected_theme')
             if selected_theme in available_themes:
-                game_settings.current_theme = selected_theme
-                game_settings.save_settings()
+                with _settings_lock:
+                    game_settings.current_theme = selected_theme
+                    game_settings.save_settings()
                 if game_instance:
                     game_instance.load_assets()
-                logging.info(f'Theme changed to {selected_theme}')
+                logging.info('Theme changed to %s', selected_theme)
             return redirect(url_for('theme_manager'))
             
     return render_template(
@@ -301,54 +711,38 @@ def theme_manager():
         available_images=available_images,
         available_sounds=available_sounds,
         available_fonts=available_fonts,
-        analytics_config=game_settings.analytics_config if hasattr(game_settings, 'analytics_config') else {}
+        analytics_config=get_analytics_config_view()
     )
 
 @app.route('/analytics', methods=['GET', 'POST'])
 def analytics_config():
     """Handle analytics configuration."""
     if request.method == 'POST':
-        if hasattr(game_settings, 'analytics_config'):
-            # Update basic settings
+        # Update basic settings
+        with _settings_lock:
             game_settings.show_analytics_overlay = request.form.get('show_analytics_overlay', 'off') == 'on'
             
             # Update analytics configuration
             analytics_config = game_settings.analytics_config
-            
-            # Data requirements
-            analytics_config['min_games_basic'] = int(request.form.get('min_games_basic', 30))
-            analytics_config['min_games_advanced'] = int(request.form.get('min_games_advanced', 300))
-            
-            # Time windows
-            analytics_config['momentum_window'] = int(request.form.get('momentum_window', 60))
-            analytics_config['quick_response_window'] = int(request.form.get('quick_response_window', 30))
-            analytics_config['scoring_run_threshold'] = int(request.form.get('scoring_run_threshold', 3))
-            
-            # Game analysis
-            analytics_config['critical_moment_threshold'] = float(request.form.get('critical_moment_threshold', 60.0))
-            analytics_config['close_game_threshold'] = int(request.form.get('close_game_threshold', 2))
-            
-            # Display settings
-            analytics_config['overlay_position'] = request.form.get('overlay_position', 'top-left')
-            analytics_config['overlay_opacity'] = float(request.form.get('overlay_opacity', 0.8))
-            analytics_config['show_predictions'] = request.form.get('show_predictions', 'off') == 'on'
-            analytics_config['show_patterns'] = request.form.get('show_patterns', 'off') == 'on'
-            analytics_config['show_momentum'] = request.form.get('show_momentum', 'off') == 'on'
-            
+            form = request.form
+            for key, coerce, default in _ANALYTICS_FORM_FIELDS:
+                analytics_config[key] = coerce(form.get(key, default))
+            for key in _ANALYTICS_FORM_CHECKBOXES:
+                analytics_config[key] = form.get(key, 'off') == 'on'
+                
             # Mode-specific settings
-            analytics_config['classic_mode']['show_analytics'] = request.form.get('classic_analytics', 'off') == 'on'
-            analytics_config['evolved_mode']['show_analytics'] = request.form.get('evolved_analytics', 'off') == 'on'
-            analytics_config['crazy_play_mode']['show_analytics'] = request.form.get('crazy_analytics', 'off') == 'on'
-            
+            for field, mode in _ANALYTICS_MODE_CHECKBOXES:
+                analytics_config[mode]['show_analytics'] = form.get(field, 'off') == 'on'
+                
             game_settings.save_settings()
-            logging.info('Analytics configuration updated via web interface')
+        logging.info('Analytics configuration updated via web interface')
             
         return redirect(url_for('analytics_config'))
         
     return render_template(
         'analytics_config.html',
         settings=game_settings,
-        analytics_config=game_settings.analytics_config if hasattr(game_settings, 'analytics_config') else {}
+        analytics_config=get_analytics_config_view()
     )
 
 @app.route('/analytics/viewer')
@@ -358,19 +752,18 @@ def analytics_viewer():
         return render_template('analytics_viewer.html', error='Database not initialized')
         
     try:
-        # Get overview data
-        stats = game_instance.db.get_game_stats()
-        total_games = len(stats) if stats else 0
-        recent_games = len([s for s in stats if s['date_time'] >= '2024-01-01']) if stats else 0
+        # Get overview data (counted in SQL, no need to fetch every game row)
+        total_games = game_instance.db.count_games()
+        recent_games = game_instance.db.count_games(since='2024-01-01') if total_games else 0
         
         # Get win rates
-        win_rates = _calculate_win_rates(stats) if stats else None
+        win_rates = _calculate_win_rates() if total_games else None
         
         # Get pattern data
-        patterns = _get_pattern_analysis(stats) if stats else None
+        patterns = _get_pattern_analysis() if total_games else None
         
         # Get momentum data
-        momentum_data = _get_momentum_analysis(stats) if stats else None
+        momentum_data = _get_momentum_analysis() if total_games else None
         
         return render_template(
             'analytics_viewer.html',
@@ -382,17 +775,18 @@ def analytics_viewer():
             current_game=game_instance.current_game_id if game_instance else None
         )
     except Exception as e:
-        logging.error(f"Error in analytics viewer: {e}")
+        logging.error("Error in analytics viewer: %s", e)
         return render_template('analytics_viewer.html', error=str(e))
 
-def _calculate_win_rates(stats):
+def _calculate_win_rates():
     """Calculate win rates from game statistics."""
-    if not stats:
+    # Aggregated in SQL rather than scanning every row in Python
+    counts = game_instance.db.get_win_counts()
+    total = counts['total_games']
+    if not total:
         return None
-        
-    total = len(stats)
-    red_wins = sum(1 for game in stats if game.get('winner_id') == game.get('player_red_id'))
-    blue_wins = sum(1 for game in stats if game.get('winner_id') == game.get('player_blue_id'))
+    red_wins = counts['red_wins']
+    blue_wins = counts['blue_wins']
     
     return {
         'red': round(red_wins / total * 100, 1),
@@ -401,24 +795,64 @@ def _calculate_win_rates(stats):
         'total_games': total
     }
 
-def _get_pattern_analysis(stats):
+def _get_pattern_analysis():
     """Analyze scoring patterns from game statistics."""
-    if not stats or not game_instance:
+    if not game_instance:
         return None
         
     return game_instance.analytics.pattern_analyzer.get_current_patterns()
 
-def _get_momentum_analysis(stats):
+def _get_momentum_analysis():
     """Get momentum analysis from game statistics."""
-    if not stats or not game_instance:
+    if not game_instance:
         return None
         
     return game_instance.analytics.momentum_tracker.get_momentum_analysis()
 
-def run_web_server(settings, game):
-    """Run the web server."""
+def _start_log_queue():
+    """Route root logger output through a queue drained by a listener thread.
+
+    Request threads then only enqueue records instead of blocking on the
+    handlers' I/O.
+    """
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    if not handlers or any(isinstance(h, logging.handlers.QueueHandler) for h in handlers):
+        return
+        
+    log_queue = queue.SimpleQueue()
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+def run_web_server(settings, game, dev=False):
+    """Run the web server.
+
+    Uses waitress (multi-threaded) unless dev is set, in which case the
+    Werkzeug development server is used.
+    """
     global game_settings
     global game_instance
     game_settings = settings
     game_instance = game
-    app.run(host='0.0.0.0', port=settings.web_server_port)
+    
+    _start_log_queue()
+    if dev:
+        app.config['TEMPLATES_AUTO_RELOAD'] = True
+    # Compile every template up front so first page loads don't pay for it
+    for template_name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(template_name)
+        
+    if not dev:
+        try:
+            from waitress import serve
+        except ImportError:
+            logging.warning('waitress not installed; falling back to the development server')
+        else:
+            serve(app, host='0.0.0.0', port=settings.web_server_port, threads=WEB_SERVER_THREADS)
+            return
+            
+    app.run(host='0.0.0.0', port=settings.web_server_port, threaded=True)